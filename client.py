@@ -1,26 +1,35 @@
 import socket
 import ssl
 import sys
+from functools import lru_cache
 from typing import Union, Optional
-from server.config import read_config
+from server.config import load_config, Config
 
 
-def create_connection(host: str, port: int, use_ssl: bool) -> Union[socket.socket, ssl.SSLSocket]:
+@lru_cache(maxsize=None)
+def get_ssl_context(cafile: str = "ssl/cert.pem") -> ssl.SSLContext:
+    """
+    Build the client SSL context once and reuse it for every connection.
+    Trusts the self-signed certificate at the given path.
+    """
+    context: ssl.SSLContext = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+    context.load_verify_locations(cafile)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_REQUIRED
+    return context
+
+
+def create_connection(
+    host: str, port: int, use_ssl: bool, cafile: str = "ssl/cert.pem"
+) -> Union[socket.socket, ssl.SSLSocket]:
     """
     Create a TCP or SSL-wrapped connection to the given host and port.
-    Trusts a self-signed certificate located in the 'ssl/cert.pem' path.
+    Trusts the self-signed certificate at cafile ('ssl/cert.pem' by default).
     """
     try:
         sock: socket.socket = socket.create_connection((host, port), timeout=5)
         if use_ssl:
-            context: ssl.SSLContext = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-
-            # Load and trust the self-signed certificate manually
-            context.load_verify_locations("ssl/cert.pem")
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_REQUIRED
-
-            ssl_sock: ssl.SSLSocket = context.wrap_socket(sock, server_hostname=host)
+            ssl_sock: ssl.SSLSocket = get_ssl_context(cafile).wrap_socket(sock, server_hostname=host)
             return ssl_sock
         return sock
     except (socket.timeout, ConnectionRefusedError):
@@ -39,15 +48,11 @@ def main() -> None:
         return
 
     query: str = sys.argv[1]
-    config: dict[str, str] = read_config("config.txt")
-
-    host: str = str(config.get("host", "127.0.0.1"))
-    port: int = int(config.get("port", 44445))
-    use_ssl: bool = bool(config.get("use_ssl", False))
+    config: Config = load_config("config.txt")
 
     try:
         sock: Union[socket.socket, ssl.SSLSocket]
-        with create_connection(host, port, use_ssl) as sock:
+        with create_connection(config.host, config.port, config.use_ssl, config.certfile) as sock:
             sock.sendall(query.encode("utf-8"))
             response: bytes = sock.recv(1024)
             print("Server response:", response.decode("utf-8").strip())
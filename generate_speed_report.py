@@ -2,7 +2,7 @@ import os
 from typing import List, Any
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
-from benchmark_algorithms import get_benchmark_elements
+from benchmark_algorithms import algorithms, get_benchmark_elements
 from stress_test_client import get_stress_test_elements
 
 styles = getSampleStyleSheet()
@@ -29,12 +29,13 @@ def get_intro_section() -> List[Any]:
 
 
 def get_setup_section() -> List[Any]:
+    names = list(algorithms)  # Horspool Scan (Numba) is only benchmarked when numba is installed
     return [
         section_heading("Setup"),
         Paragraph(
             "The evaluation was conducted on datasets containing 10,000; 100,000; 500,000; "
-            "and 1,000,000 lines of randomly generated text. Six algorithms were benchmarked: "
-            "Linear Scan, Generator Scan, Regex Match, Set Membership, Multithreaded Scan, and Binary Search. "
+            f"and 1,000,000 lines of randomly generated text. {len(names)} algorithms were benchmarked: "
+            f"{', '.join(names[:-1])}, and {names[-1]}. "
             "Each algorithm was tested in two modes: re-reading the file for each query and using a cached dataset. "
             "The stress test measured the server's query throughput (QPS) for different file sizes, "
             "stopping when the failure rate exceeded 10%.",
@@ -54,7 +55,9 @@ def get_algorithms_overview_section() -> List[Any]:
             "- Regex Match: Uses compiled regular expressions for matching.\n"
             "- Set Membership: Loads lines into a set for O(1) membership checks.\n"
             "- Multithreaded Scan: Splits the file into chunks and scans in parallel.\n"
-            "- Binary Search: Operates on sorted lines for logarithmic search time.\n",
+            "- Binary Search: Operates on sorted lines for logarithmic search time.\n"
+            + ("- Horspool Scan (Numba): JIT-compiled Boyer-Moore-Horspool scan that skips ahead "
+               "using a bad-character table.\n" if "Horspool Scan (Numba)" in algorithms else ""),
             styles["Normal"]
         ),
         Spacer(1, 12)
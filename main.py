@@ -1,6 +1,5 @@
-# Import the main TCP server class responsible for handling incoming string queries
-from server.server import StringSearchServer
+# Import the entry point that starts the TCP server (and any extra worker processes)
+from server.server import run
 
 if __name__ == "__main__":
-    server = StringSearchServer()
-    server.start()
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -1,4 +1,22 @@
-from typing import Dict, Any
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
+
+TRUE_VALUES = {"1", "true", "yes"}
+
+
+@dataclass(frozen=True)
+class Config:
+    """Typed connection settings parsed from a config file."""
+    host: str = "127.0.0.1"
+    port: int = 44445
+    use_ssl: bool = False
+    max_payload: int = 1024
+    certfile: str = "ssl/cert.pem"
+    keyfile: str = "ssl/key.pem"
+
 
 def read_config(path: str) -> Dict[str, str]:
     config: Dict[str, str] = {}
@@ -10,3 +28,39 @@ def read_config(path: str) -> Dict[str, str]:
             key, value = line.split("=", 1)
             config[key.strip()] = value.strip()
     return config
+
+
+@lru_cache(maxsize=64)
+def _read_config_at(path: str, mtime_ns: int, size: int) -> Mapping[str, str]:
+    return MappingProxyType(read_config(path))
+
+
+def read_config_cached(path: str) -> Mapping[str, str]:
+    """Return the read-only raw config, parsing the file again only when its mtime or size changed."""
+    st = os.stat(path)
+    return _read_config_at(path, st.st_mtime_ns, st.st_size)
+
+
+def parse_bool(value: str) -> bool:
+    """Interpret a config value such as 'True', 'false' or '1' as a boolean."""
+    return value.strip().lower() in TRUE_VALUES
+
+
+@lru_cache(maxsize=64)
+def _load_config_at(path: str, mtime_ns: int, size: int) -> Config:
+    raw = _read_config_at(path, mtime_ns, size)
+    defaults = Config()
+    return Config(
+        host=raw.get("host", defaults.host),
+        port=int(raw.get("port", defaults.port)),
+        use_ssl=parse_bool(raw.get("use_ssl", str(defaults.use_ssl))),
+        max_payload=int(raw.get("max_payload", defaults.max_payload)),
+        certfile=raw.get("certfile", defaults.certfile),
+        keyfile=raw.get("keyfile", defaults.keyfile),
+    )
+
+
+def load_config(path: str) -> Config:
+    """Return the typed config, sharing read_config_cached's parse and cache of the file."""
+    st = os.stat(path)
+    return _load_config_at(path, st.st_mtime_ns, st.st_size)
@@ -1,21 +1,38 @@
 from typing import Set, Iterable,List
 
-def linear_search(data: list[str], query: str) -> bool:
-    """Returns true if the query matches an entire line."""
-    for line in data:
-        if line.strip() == query:
-            return True
-    return False
+def linear_search(data: bytes, query: str) -> bool:
+    """
+    Returns true if the query matches an entire line.
+    Expects a newline-delimited buffer as returned by load_file_bytes.
+    """
+    if "\n" in query:
+        return False  # Would otherwise match across two lines.
+    return b"\n" + query.encode("utf-8") + b"\n" in data
 
 
 def load_file(path: str) -> list[str]:
+    """Returns the stripped, non-empty lines of a file."""
     try:
         with open(path, "r", encoding="utf-8") as file:
-            return [line.strip() for line in file if line.strip()]
+            return [line for line in map(str.strip, file) if line]
     except Exception as e:
         raise SystemExit(f"❌ Failed to load file: {e}")
 
 
+def load_file_bytes(path: str) -> bytes:
+    """
+    Loads the stripped, non-empty lines of a file into one buffer,
+    with a newline before the first and after every line.
+    Lines are split and stripped exactly as in load_file, so both agree on
+    Unicode whitespace. Raises OSError or UnicodeDecodeError if the file
+    cannot be read; it is called while serving queries, so it must not exit
+    the process the way load_file does.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        body = "\n".join(line for line in map(str.strip, file) if line)
+    return ("\n" + body + "\n" if body else "\n").encode("utf-8")
+
+
 def search_string(data: Iterable[str], query: str) -> bool:
     """
     Searches for a query string in the provided dataset.
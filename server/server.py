@@ -1,24 +1,65 @@
+import asyncio
+import functools
+import hashlib
+import os
+import queue
+import signal
+import sys
 import socket
 import ssl
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from ssl import SSLSocket
-from typing import Set, Optional, Mapping, Union
-from server.config import read_config
-from server.file_search import load_file, search_string
+from typing import Callable, Dict, Set, Optional, Mapping, Union, Tuple
+from server.config import Config, read_config_cached, parse_bool
+from server.file_search import load_file, load_file_bytes, linear_search
 import logging
 
+QUERY_LOG = "Query: '%s' | IP: %s | Time: %.2fms"
+INTERN_LIMIT = 4096  # Distinct raw queries remembered by _intern_query.
+
+CIPHERS = "ECDHE+AESGCM:ECDHE+CHACHA20"  # TLS 1.2 suites; TLS 1.3 suites are left at the defaults.
+DEFAULTS = Config()  # Defaults for the settings shared with the client.
+
 logging.basicConfig(
     level=logging.INFO,
     format="[%(levelname)s] %(message)s"
 )
 
+@functools.lru_cache(maxsize=None)
+def load_cert_der(certfile: str) -> bytes:
+    """Return the DER encoding of the first certificate in a PEM file, parsed once per path."""
+    with open(certfile, "r") as f:
+        return ssl.PEM_cert_to_DER_cert(f.read())
+
+
 class StringSearchServer:
-    def __init__(self, host: str = "0.0.0.0", port: int = 44445, config_path: Optional[str] = "config.txt") -> None:
-        try:
-            self.config: Mapping[str, Union[str, bool, int]] = read_config(config_path or "config.txt")
-        except FileNotFoundError:
-            raise SystemExit("❌ Config file not found. Please ensure config.txt exists.")
+    _RESP_EXISTS = b"STRING EXISTS\n"
+    _RESP_NOT_FOUND = b"STRING NOT FOUND\n"
+    _RESP_TOO_LARGE = b"QUERY TOO LARGE\n"
+    _RESP_INVALID = b"INVALID ENCODING\n"
+    _RESP_ERROR = b"SERVER ERROR\n"
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 44445,
+        config_path: Optional[str] = "config.txt",
+        *,
+        config: Optional[Mapping[str, Union[str, bool, int, float]]] = None,
+    ) -> None:
+        """
+        Settings come from config when it is given (e.g. a dict in tests);
+        otherwise they are read from the file at config_path.
+        """
+        if config is not None:
+            self.config: Mapping[str, Union[str, bool, int, float]] = config
+        else:
+            try:
+                self.config = read_config_cached(config_path or "config.txt")
+            except FileNotFoundError:
+                raise SystemExit("❌ Config file not found. Please ensure config.txt exists.")
 
         self.host: str = host
         self.port: int = port
@@ -27,9 +68,15 @@ class StringSearchServer:
         if not self.file_path:
             raise SystemExit("❌ Missing 'linuxpath' in config.txt.")
 
-        self.reread_on_query: bool = str(self.config.get("reread_on_query", "False")).lower() == "true"
-        self.max_payload: int = int(self.config.get("max_payload", 1024))
-        self.use_ssl: bool = bool(self.config.get("use_ssl", False))
+        self.reread_on_query: bool = parse_bool(str(self.config.get("reread_on_query", "False")))
+        self.max_payload: int = int(self.config.get("max_payload", DEFAULTS.max_payload))
+        self.use_ssl: bool = parse_bool(str(self.config.get("use_ssl", DEFAULTS.use_ssl)))
+        self.certfile: str = str(self.config.get("certfile", DEFAULTS.certfile))
+        self.keyfile: str = str(self.config.get("keyfile", DEFAULTS.keyfile))
+        self.max_workers: int = int(self.config.get("max_workers", 128))
+        self.backlog: int = int(self.config.get("backlog", 4096))
+        self.reuse_port: bool = parse_bool(str(self.config.get("reuse_port", "False")))
+        self.read_timeout: float = float(self.config.get("read_timeout", 10))
 
         try:
             self.data: Set[str] = set() if self.reread_on_query else set(load_file(self.file_path))
@@ -37,113 +84,278 @@ class StringSearchServer:
             raise SystemExit(f"❌ File {self.file_path} not found.")
         except Exception as e:
             raise SystemExit(f"❌ Failed to load file: {e}")
-        
+
+        self._contains: Callable[[object], bool] = self.data.__contains__
+        self._cached: Optional[Tuple[Tuple[int, int], bytes]] = None
+        self.ssl_context: Optional[ssl.SSLContext] = self._create_ssl_context() if self.use_ssl else None
+        self._intern: Dict[bytes, str] = {}
+        self._intern_lock = threading.Lock()
+
         self.running: bool = False
+        self.sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._shutdown: Optional[asyncio.Event] = None
+        # Open connections and the tasks serving them, aborted on shutdown.
+        self._writers: Dict[asyncio.StreamWriter, "Optional[asyncio.Task[None]]"] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._stopped = threading.Event()
+        self._ready = threading.Event()  # Set once the server accepts connections.
+        self._log_q: "queue.SimpleQueue[Optional[Tuple[str, str, int]]]" = queue.SimpleQueue()
+        self._log_thread: Optional[threading.Thread] = None
 
-    def handle_client(self, conn: socket.socket, addr: tuple[str, int]) -> None:
-        start_time: float = time.time()
+    @property
+    def bound_port(self) -> int:
+        """Port the server listens on; resolves port=0 once start() has bound the socket."""
+        return self.port
+
+    def _create_ssl_context(self) -> ssl.SSLContext:
+        """
+        Build the server SSL context once so that every connection shares it.
+        session_tickets sets how many TLS 1.3 session tickets each handshake issues.
+        """
         try:
-            raw_bytes = conn.recv(self.max_payload + 1)  # Read max_payload + 1 bytes.
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.num_tickets = int(self.config.get("session_tickets", 2))
+            context.set_ciphers(CIPHERS)
+            context.load_cert_chain(certfile=self.certfile, keyfile=self.keyfile)
+            fingerprint = hashlib.sha256(load_cert_der(self.certfile)).hexdigest()
+            logging.info("Loaded certificate %s (SHA-256 %s)", self.certfile, fingerprint)
+            return context
+        except (ssl.SSLError, ValueError, OSError) as e:  # OSError: missing or unreadable cert/key.
+            raise SystemExit(f"❌ SSL setup failed: {e}")
 
-            if not raw_bytes:
-                conn.sendall(b"STRING NOT FOUND\n")
-                return
+    def _intern_query(self, raw_bytes: bytes) -> str:
+        """
+        Decode and strip a raw query, reusing the string built for identical bytes
+        earlier. The oldest entry is dropped once INTERN_LIMIT queries are stored.
+        """
+        query = self._intern.get(raw_bytes)
+        if query is None:
+            query = raw_bytes.decode("utf-8").strip()  # str.strip, as load_file strips the lines.
+            with self._intern_lock:
+                if len(self._intern) >= INTERN_LIMIT:
+                    del self._intern[next(iter(self._intern))]
+                self._intern[raw_bytes] = query
+        return query
 
-            if len(raw_bytes) > self.max_payload:
-                conn.sendall(b"QUERY TOO LARGE\n")
-                return
+    def _get_buffer(self) -> Optional[bytes]:
+        """
+        Return the file as one newline-delimited buffer for reread_on_query, or
+        None if it cannot be read. The file is only read again when its
+        modification time or size changed.
+        """
+        try:
+            st = os.stat(self.file_path)
+            key = (st.st_mtime_ns, st.st_size)
+            cached = self._cached
+            if cached is None or cached[0] != key:
+                cached = self._cached = (key, load_file_bytes(self.file_path))
+            return cached[1]
+        except (OSError, UnicodeDecodeError) as e:
+            self._cached = None
+            logging.error("Failed to read %s: %s", self.file_path, e)
+            return None
 
-            if not raw_bytes:
-                conn.sendall(b"STRING NOT FOUND\n")
-                return
-            try:
-                query: str = raw_bytes.decode("utf-8").strip()
-            except UnicodeDecodeError:
-                conn.sendall(b"INVALID ENCODING\n")
-                return
+    def _build_response(self, raw_bytes: bytes) -> Tuple[bytes, Optional[str]]:
+        """Return the response for a raw query and the decoded query if a search was run."""
+        if not raw_bytes:
+            return self._RESP_NOT_FOUND, None
 
-            if len(query) == 0:
-                conn.sendall(b"STRING NOT FOUND\n")
-                return
+        if len(raw_bytes) > self.max_payload:
+            return self._RESP_TOO_LARGE, None
+
+        try:
+            query: str = self._intern_query(raw_bytes)
+        except UnicodeDecodeError:
+            return self._RESP_INVALID, None
 
-            if len(query) > self.max_payload:
-                conn.sendall(b"QUERY TOO LARGE\n")
-                return
+        if len(query) == 0:
+            return self._RESP_NOT_FOUND, None
 
-            data: Set[str] = set(load_file(self.file_path)) if self.reread_on_query else self.data
-            exists: bool = search_string(data, query)
-            response: str = "STRING EXISTS\n" if exists else "STRING NOT FOUND\n"
-            conn.sendall(response.encode("utf-8"))
+        if self.reread_on_query:
+            data = self._get_buffer()
+            if data is None:
+                return self._RESP_ERROR, query
+            exists: bool = linear_search(data, query)
+        else:
+            exists = self._contains(query)
+        return (self._RESP_EXISTS if exists else self._RESP_NOT_FOUND), query
 
-            elapsed: float = (time.time() - start_time) * 1000
-            logging.info(f"Query: '{query}' | IP: {addr[0]} | Time: {elapsed:.2f}ms")
+    def _log_query(self, query: str, ip: str, elapsed_us: int) -> None:
+        """Hand a query record to the log thread, or log it directly when none is running."""
+        if self._log_thread is not None:
+            self._log_q.put_nowait((query, ip, elapsed_us))
+        else:
+            logging.info(QUERY_LOG, query, ip, elapsed_us / 1000)
+
+    def _drain_log(self) -> None:
+        """Format and emit queued query records until a None sentinel arrives."""
+        while True:
+            record = self._log_q.get()
+            if record is None:
+                break
+            query, ip, elapsed_us = record
+            logging.info(QUERY_LOG, query, ip, elapsed_us / 1000)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve a single query on a connection accepted by the event loop."""
+        start_ns: int = time.perf_counter_ns()
+        addr = writer.get_extra_info("peername") or ("unknown", 0)  # Empty for Unix sockets.
+        self._writers[writer] = asyncio.current_task()
+        try:
+            # Read max_payload + 1 bytes; an idle client must not hold the connection forever.
+            raw_bytes = await asyncio.wait_for(reader.read(self.max_payload + 1), timeout=self.read_timeout)
+            if self.reread_on_query and self._pool is not None:
+                # Rereading the file blocks, so keep it off the event loop.
+                loop = asyncio.get_running_loop()
+                try:
+                    response, query = await loop.run_in_executor(self._pool, self._build_response, raw_bytes)
+                except Exception as e:
+                    # The future re-raises inside the loop; answer this client instead of dropping it.
+                    logging.error("Search failed: %s", e)
+                    response, query = self._RESP_ERROR, None
+            else:
+                response, query = self._build_response(raw_bytes)
+            writer.write(response)
+            await writer.drain()
 
+            if query is not None:
+                self._log_query(query, addr[0], (time.perf_counter_ns() - start_ns) // 1000)
+
+        except asyncio.TimeoutError:
+            logging.error("Connection with %s timed out.", addr)
         except (ConnectionResetError, BrokenPipeError):
-            logging.error(f"Connection with {addr} was reset.")
+            logging.error("Connection with %s was reset.", addr)
         except Exception as e:
-            logging.error(f"Unexpected error: {e}")
+            logging.error("Unexpected error: %s", e)
         finally:
+            writer.close()
             try:
-                conn.shutdown(socket.SHUT_WR)
+                await writer.wait_closed()
             except Exception:
                 pass
-            conn.close()
+            self._writers.pop(writer, None)
+
+    async def _serve(self, sock: socket.socket) -> None:
+        """Accept connections on the listening socket until stop() is called."""
+        self._shutdown = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        ssl_context = self.ssl_context if self.use_ssl else None
+        server = await asyncio.start_server(
+            self._handle, sock=sock, ssl=ssl_context, backlog=self.backlog,
+            ssl_handshake_timeout=self.read_timeout if ssl_context is not None else None,
+        )
+        self._ready.set()
+        try:
+            if self.running:
+                await self._shutdown.wait()
+        finally:
+            # Since 3.12 Server.wait_closed() also waits for every open connection, so
+            # an idle client would block shutdown. Drop the connections instead and
+            # give their handlers a moment to finish.
+            server.close()
+            if hasattr(server, "abort_clients"):
+                server.abort_clients()  # 3.13+: also covers handshakes still in progress.
+            for writer in list(self._writers):
+                writer.transport.abort()
+            tasks = [task for task in self._writers.values() if task is not None]
+            if tasks:
+                await asyncio.wait(tasks, timeout=1.0)
 
     def start(self) -> None:
-        logging.info(f"Server starting on {self.host}:{self.port} (SSL: {self.use_ssl})")
+        logging.info("Server starting on %s:%s (SSL: %s)", self.host, self.port, self.use_ssl)
         self.running = True
+        self._ready.clear()
+        self._stopped.clear()
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.reuse_port:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
 
         try:
             self.sock.bind((self.host, self.port))
             if self.port == 0:
                 self.port = self.sock.getsockname()[1]
-                logging.info(f"Server dynamically bound to port {self.port}")
+                logging.info("Server dynamically bound to port %s", self.port)
 
-            self.sock.listen()
-            self.sock.settimeout(1.0)  # Allow a clean shutdown
+            self.sock.listen(self.backlog)
 
-            if self.use_ssl:
-                try:
-                    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-                    context.load_cert_chain(certfile="ssl/cert.pem", keyfile="ssl/key.pem")
-                    self.sock = context.wrap_socket(self.sock, server_side=True)
-                except ssl.SSLError as e:
-                    raise SystemExit(f"❌ SSL setup failed: {e}")
+            if self.use_ssl and self.ssl_context is None:
+                self.ssl_context = self._create_ssl_context()
+
+            if self.reread_on_query:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sss")
+
+            self._log_thread = threading.Thread(target=self._drain_log, name="sss-log", daemon=True)
+            self._log_thread.start()
 
             logging.info("Server is listening for incoming connections...")
-            while self.running:
-                try:
-                    conn, addr = self.sock.accept()
-                    thread = threading.Thread(target=self.handle_client, args=(conn, addr), daemon=True)
-                    thread.start()
-                except socket.timeout:
-                    continue
-                except ssl.SSLError as e:
-                    logging.error(f"❌ SSL handshake failed: {e}")
-                    continue
-                except OSError as e:
-                    if self.running:
-                        logging.error(f"Accept failed: {e}")
-                    break
+            asyncio.run(self._serve(self.sock))
         except OSError as e:
             raise SystemExit(f"❌ Could not start server: {e}")
         finally:
             self.sock.close()
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._log_thread is not None:
+                self._log_q.put_nowait(None)
+                self._log_thread.join(timeout=1.0)
+                self._log_thread = None
+            self._loop = None
+            self._stopped.set()
+
 
-    
     def stop(self) -> None:
         """Stop the server gracefully."""
         self.running = False
-        try:
-            self.sock.shutdown(socket.SHUT_RDWR)
-        except Exception:
-            pass
-        finally:
-            self.sock.close()
+        loop, shutdown = self._loop, self._shutdown
+        if loop is not None and shutdown is not None:
+            try:
+                loop.call_soon_threadsafe(shutdown.set)
+            except RuntimeError:
+                return  # The event loop has already finished.
+            self._stopped.wait(timeout=5.0)
+
+
+def run(config_path: str = "config.txt", host: Optional[str] = None, port: Optional[int] = None) -> None:
+    """
+    Load the data once, then fork workers-1 extra processes that each serve the
+    same port through SO_REUSEPORT. The forked workers share the loaded lines
+    copy-on-write, and the parent stops them when its own server exits.
+    host and port override the StringSearchServer defaults.
+    """
+    server = StringSearchServer(config_path=config_path)
+    if host is not None:
+        server.host = host
+    if port is not None:
+        server.port = port
+    workers = int(server.config.get("workers", 1))
+    children: list[int] = []
+    if workers > 1:
+        server.reuse_port = True
+        for _ in range(workers - 1):
+            pid = os.fork()
+            if pid == 0:
+                children = []
+                break
+            children.append(pid)
+        if children:
+            # Exit through the finally block below so the workers are stopped too.
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+            logging.info("Started %s worker processes", workers)
+
+    try:
+        server.start()
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
 
 
 if __name__ == "__main__":
-    server = StringSearchServer()
-    server.start()
+    run()
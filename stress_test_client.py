@@ -3,6 +3,7 @@ import ssl
 import time
 import csv
 import os
+from typing import Optional
 import pandas as pd
 import matplotlib.pyplot as plt
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Flowable
@@ -27,21 +28,28 @@ PDF_PATH = os.path.join("pdf", "speed_report.pdf")
 
 os.makedirs("pdf", exist_ok=True)
 
+# One SSL context for the whole run; the last TLS session is kept so that
+# the next connection can resume it instead of doing a full handshake.
+SSL_CONTEXT: Optional[ssl.SSLContext] = ssl._create_unverified_context() if USE_SSL else None  # skip CA verification
+_tls_session: Optional[ssl.SSLSession] = None
+
 # Socket creation with self-signed SSL support 
 def create_socket() -> socket.socket:
     sock = socket.create_connection((SERVER_HOST, SERVER_PORT), timeout=2)
-    if USE_SSL:
-        context = ssl._create_unverified_context()  # skip CA verification
-        sock = context.wrap_socket(sock, server_hostname=SERVER_HOST)
+    if SSL_CONTEXT is not None:
+        sock = SSL_CONTEXT.wrap_socket(sock, server_hostname=SERVER_HOST, session=_tls_session)
     return sock
 
 # Send a single query
 def send_query(query: str) -> bool:
     """Send a query to the server and return True if successful, False otherwise."""
+    global _tls_session
     try:
         with create_socket() as sock:
             sock.sendall(query.encode("utf-8"))
             sock.recv(4096)
+            if isinstance(sock, ssl.SSLSocket):
+                _tls_session = sock.session
         return True
     except Exception as e:
         print(f"[ERROR] ❌ {e}")
@@ -59,12 +67,17 @@ def stress_test() -> None:
                 queries = qps * BATCH_DURATION_SEC
                 failures = 0
 
-                start_batch = time.time()
-                for _ in range(queries):
+                interval = 1 / qps
+                start_batch = time.perf_counter()
+                for i in range(queries):
                     if not send_query(f"search_term|{file_size}"):
                         failures += 1
-                    time.sleep(1 / qps)
-                total_time = time.time() - start_batch
+                    # Sleep until the next query's slot instead of a fixed 1/qps after each one,
+                    # so the time spent sending does not stretch the batch.
+                    delay = start_batch + (i + 1) * interval - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                total_time = time.perf_counter() - start_batch
 
                 success_rate = (queries - failures) / queries if queries > 0 else 0
                 print(f" QPS={qps:<3} | SuccessRate={success_rate:.2f} | Failures={failures} | TotalTime={total_time:.2f}s")
@@ -84,8 +97,7 @@ def get_stress_test_elements() -> list[Flowable]:
     
     # Create plot
     plt.figure(figsize=(8, 6))
-    for file_size in df["FileSize"].unique():
-        subset = df[df["FileSize"] == file_size]
+    for file_size, subset in df.groupby("FileSize", sort=False):
         plt.plot(subset["QPS"], subset["TotalTime"], marker="o", label=file_size)
     plt.xlabel("Queries per Second (QPS)")
     plt.ylabel("Total Time (seconds)")
@@ -0,0 +1,112 @@
+import asyncio
+import datetime
+import functools
+import ipaddress
+import os
+import socket
+import ssl
+import threading
+import pytest
+from pathlib import Path
+from typing import Optional, Tuple
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from server.server import StringSearchServer
+
+
+HOST = "127.0.0.1"
+
+# Client context shared by every SSL test; PROTOCOL_TLS_CLIENT skips loading the default CA bundle.
+CLIENT_CTX = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+CLIENT_CTX.check_hostname = False
+CLIENT_CTX.verify_mode = ssl.CERT_NONE
+
+
+@functools.lru_cache(maxsize=None)
+def get_test_ssl_context(cert_path: str) -> ssl.SSLContext:
+    """Return a client SSL context that trusts only the certificate at cert_path."""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)  # Skips the system CA bundle.
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_REQUIRED
+    context.load_verify_locations(cert_path)
+    return context
+
+
+def create_temp_config(tmp_path: Path, content: str) -> str:
+    """
+    Create a temporary config file in tmp_path.
+    Automatically convert relative linuxpath entries to absolute paths.
+    """
+    lines = []
+    for line in content.splitlines():
+        if line.startswith("linuxpath="):
+            _, value = line.split("=", 1)
+            value = value.strip()
+            if not os.path.isabs(value):
+                value = str(tmp_path / value)
+            line = f"linuxpath={value}"
+        lines.append(line)
+    config_path = tmp_path / "config.txt"
+    config_path.write_text("\n".join(lines) + "\n")
+    return str(config_path)
+
+
+def start_server(server: StringSearchServer) -> threading.Thread:
+    """Run server.start() in a daemon thread and wait until it accepts connections."""
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+    assert server._ready.wait(timeout=5.0), "Server failed to start"
+    return thread
+
+
+def serve_in_process(server: StringSearchServer, conn: socket.socket) -> None:
+    """Serve one query on conn (e.g. one end of a socketpair) through the server's asyncio handler."""
+    async def serve() -> None:
+        reader, writer = await asyncio.open_connection(sock=conn)
+        await server._handle(reader, writer)
+
+    asyncio.run(serve())
+
+
+def send_query(message: str, port: int, use_ssl: bool = True, context: Optional[ssl.SSLContext] = None) -> str:
+    """Send a query to the test server with optional SSL and return the stripped response."""
+    sock = socket.create_connection((HOST, port), timeout=2)
+
+    if use_ssl:
+        sock = (context or CLIENT_CTX).wrap_socket(sock, server_hostname=HOST)
+
+    with sock:
+        sock.sendall(message.encode("utf-8"))
+        return sock.recv(4096).decode("utf-8").strip()
+
+
+@pytest.fixture(scope="session")
+def tls_material(tmp_path_factory: pytest.TempPathFactory) -> Tuple[str, str]:
+    """Generate a self-signed certificate and key for 127.0.0.1 once per test session."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, HOST)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(HOST))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+
+    tls_dir = tmp_path_factory.mktemp("tls")
+    cert_path = tls_dir / "cert.pem"
+    key_path = tls_dir / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    return str(cert_path), str(key_path)
@@ -1,69 +1,29 @@
-import socket
-import ssl
-import threading
-import time
-import pytest
+from pathlib import Path
+from typing import Tuple
 from server.server import StringSearchServer
-from typing import cast
+from conftest import HOST, get_test_ssl_context, send_query, start_server
 
 
-HOST = "127.0.0.1"
-CERT_PATH = "ssl/cert.pem"  # Path to the trusted self-signed certificate.
-
-
-def get_free_port() -> int:
-    """Return an available port on the system."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(("", 0))
-        return cast(int, s.getsockname()[1])
-
-
-def start_test_server(port: int) -> StringSearchServer:
-    """Start the StringSearchServer in a background thread."""
-    server = StringSearchServer(host=HOST, port=port)
-    thread = threading.Thread(target=server.start, daemon=True)
-    thread.start()
-    time.sleep(1)  # Allow the server to start.
+def start_test_server(tmp_path: Path, tls_material: Tuple[str, str]) -> StringSearchServer:
+    """Start the StringSearchServer with the project config.txt, serving the test certificate."""
+    cert_path, key_path = tls_material
+    config_file = tmp_path / "config.txt"
+    config_file.write_text(Path("config.txt").read_text() + f"\ncertfile={cert_path}\nkeyfile={key_path}\n")
+    server = StringSearchServer(host=HOST, port=0, config_path=str(config_file))
+    start_server(server)
     return server
 
 
-def get_test_ssl_context() -> ssl.SSLContext:
-    """Return an SSL context that trusts the self-signed cert."""
-    context = ssl.create_default_context()
-    context.check_hostname = False
-    context.verify_mode = ssl.CERT_REQUIRED
-    context.load_verify_locations(CERT_PATH)
-    return context
-
-def send_query(query: str, port: int, use_ssl: bool = False) -> str:
-    """Send a query to the server and return the response."""
-    sock = socket.create_connection((HOST, port), timeout=2)
-
-    if use_ssl:
-        context = ssl.create_default_context()
-        context.check_hostname = False
-        context.verify_mode = ssl.CERT_REQUIRED
-        context.load_verify_locations(CERT_PATH) # Load the trusted cert
-        sock = context.wrap_socket(sock, server_hostname=HOST)
-
-    sock.sendall(query.encode())
-    response = sock.recv(4096).decode()
-    sock.close()
-    return response
-
-
-def test_valid_query_response() -> None:
+def test_valid_query_response(tmp_path: Path, tls_material: Tuple[str, str]) -> None:
     """Ensure that a legitimate query provides the right response."""
-    port = get_free_port()
-    start_test_server(port)
-    response = send_query("apple", port=port, use_ssl=True)
+    port = start_test_server(tmp_path, tls_material).bound_port
+    response = send_query("apple", port=port, context=get_test_ssl_context(tls_material[0]))
     assert response.strip() in ["STRING EXISTS", "STRING NOT FOUND"]
 
 
-def test_invalid_query_response() -> None:
+def test_invalid_query_response(tmp_path: Path, tls_material: Tuple[str, str]) -> None:
     """Ensure invalid query returns 'STRING NOT FOUND'."""
-    port = get_free_port()
-    start_test_server(port)
-    response = send_query("nonexistentqueryxyz", port=port, use_ssl=True)
+    port = start_test_server(tmp_path, tls_material).bound_port
+    response = send_query("nonexistentqueryxyz", port=port, context=get_test_ssl_context(tls_material[0]))
     assert response.strip() == "STRING NOT FOUND"
 
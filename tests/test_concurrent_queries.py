@@ -1,51 +1,18 @@
 from pathlib import Path
-from typing import List, cast
+from typing import List, Tuple
 import pytest
 import socket
 import ssl
 import threading
-import time
 from server.server import StringSearchServer
+from conftest import get_test_ssl_context, start_server
 
-CERT_PATH = "ssl/cert.pem"  # Path to the trusted self-signed cert
 
-
-def get_free_port() -> int:
-    """Get a free port dynamically."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(("", 0))
-        host, port = s.getsockname()
-        return cast(int, port)
-
-
-def get_test_ssl_context() -> ssl.SSLContext:
-    """Return an SSL context that trusts the self-signed certificate."""
-    context = ssl.create_default_context()
-    context.check_hostname = False
-    context.verify_mode = ssl.CERT_REQUIRED
-    context.load_verify_locations(CERT_PATH)  # Load the self-signed cert
-    return context
-
-
-def wait_for_server(host: str, port: int, timeout: float = 2.0) -> None:
-    """Wait until the server is listening and supports the SSL handshake."""
-    start = time.time()
-    context = get_test_ssl_context()
-
-    while time.time() - start < timeout:
-        try:
-            with socket.create_connection((host, port), timeout=0.2) as sock:
-                with context.wrap_socket(sock, server_hostname=host):
-                    return
-        except (OSError, ssl.SSLError):
-            time.sleep(0.05)
-    raise RuntimeError(f"Server did not start on {host}:{port} in time.")
-
-
-def test_concurrent_queries(tmp_path_factory: pytest.TempPathFactory) -> None:
+def test_concurrent_queries(tmp_path_factory: pytest.TempPathFactory, tls_material: Tuple[str, str]) -> None:
     """
     Test that the server can handle multiple concurrent queries with SSL enabled.
     """
+    cert_path, key_path = tls_material
     tmp_path: Path = tmp_path_factory.mktemp("data")
     data_file: Path = tmp_path / "strings.txt"
     data_file.write_text("apple\nbanana\ncherry\n")
@@ -55,21 +22,20 @@ def test_concurrent_queries(tmp_path_factory: pytest.TempPathFactory) -> None:
         f"linuxpath={data_file}\n"
         "max_payload=1024\n"
         "use_ssl=True\n"
+        f"certfile={cert_path}\n"
+        f"keyfile={key_path}\n"
     )
 
-    port: int = get_free_port()
-    server: StringSearchServer = StringSearchServer(port=port, config_path=str(config_file))
-    server_thread: threading.Thread = threading.Thread(target=server.start, daemon=True)
-    server_thread.start()
-
-    wait_for_server("127.0.0.1", port)
+    server: StringSearchServer = StringSearchServer(port=0, config_path=str(config_file))
+    server_thread: threading.Thread = start_server(server)
+    port: int = server.bound_port
 
     queries: List[str] = ["apple", "banana", "grape", "cherry"]
     responses: List[str] = []
 
     def send_query(q: str) -> None:
         try:
-            context = get_test_ssl_context()
+            context = get_test_ssl_context(cert_path)
             with socket.create_connection(("127.0.0.1", port)) as sock:
                 with context.wrap_socket(sock, server_hostname="127.0.0.1") as ssock:
                     ssock.sendall(q.encode("utf-8"))
@@ -2,16 +2,8 @@ from pathlib import Path
 from typing import Dict
 import pytest
 
-from server.config import read_config
-
-
-def create_temp_config(tmp_path: Path, content: str) -> Path:
-    """
-    Create a temporary configuration file with the specified content and return its path.
-    """
-    config_file = tmp_path / "config.txt"
-    config_file.write_text(content)
-    return config_file
+from server.config import read_config, read_config_cached, parse_bool, load_config, Config
+from conftest import create_temp_config
 
 
 def test_valid_config(tmp_path: Path) -> None:
@@ -77,3 +69,42 @@ def test_missing_file_raises(tmp_path: Path) -> None:
     missing_path = tmp_path / "nonexistent_config.txt"
     with pytest.raises(FileNotFoundError):
         read_config(str(missing_path))
+
+
+def test_parse_bool_values() -> None:
+    """
+    Test that boolean config values are parsed from their string form.
+    """
+    assert parse_bool("True") is True
+    assert parse_bool(" yes ") is True
+    assert parse_bool("1") is True
+    assert parse_bool("False") is False
+    assert parse_bool("false") is False
+    assert parse_bool("") is False
+
+
+def test_load_config_parses_types(tmp_path: Path) -> None:
+    """
+    Test that load_config converts values and fills in defaults for missing keys.
+    """
+    content = "host=localhost\nport=5000\nuse_ssl=false\nmax_payload=64\n"
+    config_path = create_temp_config(tmp_path, content)
+
+    config = load_config(str(config_path))
+    assert config == Config(host="localhost", port=5000, use_ssl=False, max_payload=64)
+    assert load_config(str(config_path)) is config  # Parsed once and cached
+
+    Path(config_path).write_text("port=6000\n")
+    assert load_config(str(config_path)).port == 6000
+
+
+def test_read_config_cached_reparses_changed_file(tmp_path: Path) -> None:
+    """
+    Check that the cached reader reuses the parsed config until the file changes.
+    """
+    config_path = create_temp_config(tmp_path, "port=5000\n")
+    config = read_config_cached(config_path)
+    assert read_config_cached(config_path) is config
+
+    Path(config_path).write_text("port=6000\nuse_ssl=True\n")
+    assert read_config_cached(config_path)["port"] == "6000"
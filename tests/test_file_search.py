@@ -1,6 +1,6 @@
 import os
 import pytest
-from server.file_search import load_file, search_string, linear_search
+from server.file_search import load_file, load_file_bytes, search_string, linear_search
 from pathlib import Path
 
 def test_load_file_creates_list(tmp_path: Path) -> None:
@@ -59,17 +59,40 @@ def test_search_string_case_sensitive() -> None:
     data = ["apple", "banana", "cherry"]
     assert search_string(data, "Apple") is False  # Different case
 
+def test_load_file_bytes_wraps_lines(tmp_path: Path) -> None:
+    """Test that load_file_bytes strips lines, drops blanks and adds newline sentinels."""
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("apple \n\n banana\r\ncherry")
+    assert load_file_bytes(str(file_path)) == b"\napple\nbanana\ncherry\n"
+
+def test_load_file_bytes_empty_file(tmp_path: Path) -> None:
+    """Test that load_file_bytes returns a lone sentinel for an empty file."""
+    file_path = tmp_path / "empty.txt"
+    file_path.write_text("")
+    data = load_file_bytes(str(file_path))
+    assert data == b"\n"
+    assert linear_search(data, "") is False
+
 def test_linear_search_exact_match() -> None:
     """Test that linear_search returns true when the exact line matches the query."""
-    data = ["apple", "banana", "cherry"]
+    data = b"\napple\nbanana\ncherry\n"
     assert linear_search(data, "banana") is True
+    assert linear_search(data, "apple") is True
+    assert linear_search(data, "cherry") is True
 
 def test_linear_search_no_match() -> None:
     """Test that linear_search returns false when the query is not found in the data."""
-    data = ["apple", "banana", "cherry"]
+    data = b"\napple\nbanana\ncherry\n"
     assert linear_search(data, "mango") is False
+    assert linear_search(data, "nan") is False  # Substring of a line
+
+def test_linear_search_rejects_embedded_newline() -> None:
+    """Test that a query spanning two lines does not match."""
+    data = b"\napple\nbanana\ncherry\n"
+    assert linear_search(data, "apple\nbanana") is False
 
-def test_linear_search_strips_whitespace() -> None:
+def test_linear_search_strips_whitespace(tmp_path: Path) -> None:
     """Test that linear_search ignores leading/trailing whitespace in lines during match."""
-    data = ["  apple  ", "\tbanana\n", "  cherry "]
-    assert linear_search(data, "banana") is True
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("  apple  \n\tbanana\n  cherry ")
+    assert linear_search(load_file_bytes(str(file_path)), "banana") is True
@@ -1,29 +1,10 @@
 import socket
-import os
 import ssl
 import pytest
 from pathlib import Path
 from typing import Tuple
 from server.server import StringSearchServer
-
-def create_temp_config(tmp_path: Path, content: str) -> str:
-    """
-    Create a temporary config file in tmp_path.
-    Automatically convert relative linuxpath entries to absolute paths.
-    """
-    lines = []
-    for line in content.strip().splitlines():
-        if line.startswith("linuxpath="):
-            _, value = line.split("=", 1)
-            value = value.strip()
-            if not os.path.isabs(value):
-                value = str(tmp_path / value)
-            line = f"linuxpath={value}"
-        lines.append(line)
-    config_path = tmp_path / "config.txt"
-    config_path.write_text("\n".join(lines))
-    return str(config_path)
-
+from conftest import create_temp_config, serve_in_process
 
 def test_missing_config(tmp_path: Path) -> None:
     """Test SystemExit when config.txt is missing."""
@@ -54,13 +35,11 @@ def test_empty_query(tmp_path: Path) -> None:
     data_file.write_text("apple\nbanana\n")
     config_path: str = create_temp_config(tmp_path, f"linuxpath={data_file}\n")
 
-    data_file.write_text("apple\nbanana\n")
-
     server = StringSearchServer(config_path=config_path)
     sock1, sock2 = socket.socketpair()
     with sock1, sock2:
         sock1.shutdown(socket.SHUT_WR)  # Ensure recv() returns EOF
-        server.handle_client(sock2, ("127.0.0.1", 0))
+        serve_in_process(server, sock2)
         response: str = sock1.recv(1024).decode("utf-8")
         assert "STRING NOT FOUND" in response
 
@@ -78,7 +57,7 @@ def test_query_too_large(tmp_path: Path) -> None:
         large_query: bytes = b"a" * 50
         sock1.sendall(large_query)
         sock1.shutdown(socket.SHUT_WR)
-        server.handle_client(sock2, ("127.0.0.1", 0))
+        serve_in_process(server, sock2)
         response: str = sock1.recv(1024).decode("utf-8")
         assert "QUERY TOO LARGE" in response
 
@@ -95,7 +74,7 @@ def test_invalid_encoding(tmp_path: Path) -> None:
     with sock1, sock2:
         sock1.sendall(b"\xff\xfe")  # Invalid UTF-8
         sock1.shutdown(socket.SHUT_WR)
-        server.handle_client(sock2, ("127.0.0.1", 0))
+        serve_in_process(server, sock2)
         response: str = sock1.recv(1024).decode("utf-8")
         assert "INVALID ENCODING" in response
 
@@ -116,3 +95,15 @@ def test_ssl_setup_failure(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> N
         server = StringSearchServer(port=0, config_path=config_path)
         server.start()
     assert "SSL setup failed" in str(exc.value)
+
+
+def test_ssl_missing_cert_file(tmp_path: Path) -> None:
+    """Test that a missing certificate is reported as an SSL setup failure."""
+    data_file: Path = tmp_path / "test_data.txt"
+    data_file.write_text("apple\nbanana\n")
+    config_path: str = create_temp_config(
+        tmp_path, f"linuxpath=test_data.txt\nuse_ssl=True\ncertfile={tmp_path / 'missing.pem'}\n"
+    )
+    with pytest.raises(SystemExit) as exc:
+        StringSearchServer(port=0, config_path=config_path)
+    assert "SSL setup failed" in str(exc.value)
@@ -1,141 +1,111 @@
+import os
+import signal
 import socket
-import ssl
-import threading
+import subprocess
+import sys
 import time
 import pytest
 from pathlib import Path
 from unittest.mock import patch
 from types import SimpleNamespace
-from typing import Tuple, Generator, Any
+from typing import List, Tuple, Any
 from server.server import StringSearchServer
 from server.file_search import load_file
 from _pytest.monkeypatch import MonkeyPatch
+from conftest import HOST, CLIENT_CTX, create_temp_config, send_query, serve_in_process, start_server
 
 
-HOST = "127.0.0.1"
-
-def get_free_port() -> int:
-    """Find and return a free TCP port from the OS."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('', 0))
-        _, port = s.getsockname()
-        return int(port)
-
-def send_query(message: str, port: int, use_ssl: bool = True) -> str:
-    """Send a query to the test server with optional SSL."""
-    sock = socket.create_connection((HOST, port))
-
-    if use_ssl:
-        context = ssl.create_default_context()
-        context.check_hostname = False
-        context.verify_mode = ssl.CERT_NONE
-        sock = context.wrap_socket(sock, server_hostname=HOST)
-
-    sock.sendall(message.encode("utf-8"))
-    response = sock.recv(4096).decode("utf-8").strip()
-    sock.close()
-    return response
-
-
-@pytest.fixture(scope="function", autouse=True)
-def start_test_server(tmp_path_factory: pytest.TempPathFactory) -> Generator[Tuple[StringSearchServer, int], None, None]:
-    """Start a test server in a background thread for client tests."""
-    tmp_path: Path = tmp_path_factory.mktemp("config")
-    data_file: Path = tmp_path / "test_data.txt"
+@pytest.fixture(scope="module")
+def logic_server(tmp_path_factory: pytest.TempPathFactory) -> StringSearchServer:
+    """Build one server, shared by the in-process request tests in this module."""
+    data_file: Path = tmp_path_factory.mktemp("data") / "test_data.txt"
     data_file.write_text("apple\nbanana\n")
+    return StringSearchServer(config={"linuxpath": str(data_file), "max_payload": 1024, "reread_on_query": True})
+
+
+def query_in_process(server: StringSearchServer, payload: bytes) -> str:
+    """Serve one payload through the asyncio handler over a socketpair and return the stripped reply."""
+    client, conn = socket.socketpair()
+    with client:
+        client.sendall(payload)
+        client.shutdown(socket.SHUT_WR)
+        serve_in_process(server, conn)
+        return client.recv(4096).decode("utf-8").strip()
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("apple", "STRING EXISTS"),
+        ("nonexistentqueryxyz", "STRING NOT FOUND"),
+        ("\n", "STRING NOT FOUND"),
+        ("a" * 2048, "QUERY TOO LARGE"),
+    ],
+    ids=["valid", "invalid", "empty", "oversized"],
+)
+def test_query_response(logic_server: StringSearchServer, query: str, expected: str) -> None:
+    assert query_in_process(logic_server, query.encode("utf-8")) == expected
+
+def test_invalid_encoding_response(logic_server: StringSearchServer) -> None:
+    assert query_in_process(logic_server, b'\xff\xfe\xfd') == "INVALID ENCODING"
+
+
+def test_ssl_query_response(tmp_path_factory: pytest.TempPathFactory, tls_material: Tuple[str, str]) -> None:
+    cert_path, key_path = tls_material
+    tmp_path = tmp_path_factory.mktemp("ssl_config")
+    data_file = tmp_path / "test_data.txt"
+    data_file.write_text("securedata\n")
 
-    config_file: Path = tmp_path / "config.txt"
+    config_file = tmp_path / "config.txt"
     config_file.write_text(
         f"linuxpath={data_file}\n"
         "max_payload=1024\n"
-        "reread_on_query=True\n"
+        "reread_on_query=False\n"
         "use_ssl=True\n"
+        f"certfile={cert_path}\n"
+        f"keyfile={key_path}\n"
     )
 
-    port: int = get_free_port()
-    server: StringSearchServer = StringSearchServer(port=port, config_path=str(config_file))
-    server.use_ssl = False
-    server_thread: threading.Thread = threading.Thread(target=server.start, daemon=True)
-    server_thread.start()
-
-    for _ in range(10):
-        try:
-            with socket.create_connection((HOST, port), timeout=0.1):
-                break
-        except (ConnectionRefusedError, OSError):
-            time.sleep(0.1)
-    else:
-        raise RuntimeError("Server failed to start in time")
-
-    yield server, port
-    server.stop()
-    server_thread.join(timeout=1)
-
-
-def test_valid_query_response(start_test_server: Tuple[StringSearchServer, int]) -> None:
-    server, port = start_test_server
-    response: str = send_query("apple", port, use_ssl=server.use_ssl)
-    assert response in ["STRING EXISTS", "STRING NOT FOUND"]
+    server = StringSearchServer(port=0, config_path=str(config_file))
+    server_thread = start_server(server)
+    port = server.bound_port
 
-def test_invalid_query_response(start_test_server: Tuple[StringSearchServer, int]) -> None:
-    server, port = start_test_server
-    response = send_query("nonexistentqueryxyz", port, use_ssl=server.use_ssl)
-    assert response == "STRING NOT FOUND"
-
-def test_empty_query_response(start_test_server: Tuple[StringSearchServer, int]) -> None:
-    server, port = start_test_server
-    response = send_query("\n", port, use_ssl=server.use_ssl)
-    assert response == "STRING NOT FOUND"
-
-def test_oversized_query_response(start_test_server: Tuple[StringSearchServer, int]) -> None:
-    server, port = start_test_server
-    oversized = "a" * 2048
-    response = send_query(oversized, port, use_ssl=server.use_ssl)
-    assert response == "QUERY TOO LARGE"
+    response = send_query("securedata", port, use_ssl=True)
+    assert response == "STRING EXISTS"
 
-def test_invalid_encoding_response(start_test_server: Tuple[StringSearchServer, int]) -> None:
-    server, port = start_test_server
-    sock = socket.create_connection((HOST, port))
-    sock.sendall(b'\xff\xfe\xfd')
-    response = sock.recv(4096).decode("utf-8").strip()
-    assert response == "INVALID ENCODING"
-    sock.close()
+    server.stop()
+    server_thread.join(timeout=1)
 
 
-def test_ssl_query_response(tmp_path_factory: pytest.TempPathFactory) -> None:
-    tmp_path = tmp_path_factory.mktemp("ssl_config")
+@pytest.mark.parametrize("tickets, expected", [("", [False, True]), ("session_tickets=0\n", [False, False])], ids=["default", "disabled"])
+def test_ssl_session_resumption(
+    tmp_path_factory: pytest.TempPathFactory, tls_material: Tuple[str, str], tickets: str, expected: List[bool]
+) -> None:
+    """Clients resume with a session ticket unless session_tickets=0 stops the server issuing them."""
+    cert_path, key_path = tls_material
+    tmp_path = tmp_path_factory.mktemp("ssl_resume")
     data_file = tmp_path / "test_data.txt"
     data_file.write_text("securedata\n")
 
     config_file = tmp_path / "config.txt"
-    config_file.write_text(
-        f"linuxpath={data_file}\n"
-        "max_payload=1024\n"
-        "reread_on_query=False\n"
-        "use_ssl=True\n"
-    )
-
-    port = get_free_port()
-    server = StringSearchServer(port=port, config_path=str(config_file))
-    server.use_ssl = True
+    config_file.write_text(f"linuxpath={data_file}\nuse_ssl=True\ncertfile={cert_path}\nkeyfile={key_path}\n{tickets}")
 
-    server_thread = threading.Thread(target=server.start, daemon=True)
-    server_thread.start()
+    server = StringSearchServer(port=0, config_path=str(config_file))
+    server_thread = start_server(server)
+    port = server.bound_port
 
-    for _ in range(10):
-        try:
-            with socket.create_connection((HOST, port), timeout=0.1):
-                break
-        except (ConnectionRefusedError, OSError):
-            time.sleep(0.1)
-    else:
-        raise RuntimeError("SSL Server did not start in time")
-
-    response = send_query("securedata", port, use_ssl=True)
-    assert response in ["STRING EXISTS", "STRING NOT FOUND"]
+    session = None
+    reused = []
+    for _ in range(2):
+        with CLIENT_CTX.wrap_socket(socket.create_connection((HOST, port)), server_hostname=HOST, session=session) as sock:
+            sock.sendall(b"securedata")
+            assert sock.recv(4096).decode("utf-8").strip() == "STRING EXISTS"
+            reused.append(sock.session_reused)
+            session = sock.session
 
     server.stop()
     server_thread.join(timeout=1)
+    assert reused == expected
 
 
 def test_server_fails_on_missing_data_file(tmp_path_factory: pytest.TempPathFactory) -> None:
@@ -178,7 +148,7 @@ def test_load_file_failure_triggers_sysexit(monkeypatch: MonkeyPatch) -> None:
     def mock_open(*args: Any, **kwargs: Any) -> Any:
         raise IOError("simulated open failure")
 
-    monkeypatch.setattr("builtins.open", mock_open)
+    monkeypatch.setattr("server.file_search.open", mock_open, raising=False)
 
     with pytest.raises(SystemExit) as excinfo:
         load_file("fake.txt")
@@ -186,7 +156,8 @@ def test_load_file_failure_triggers_sysexit(monkeypatch: MonkeyPatch) -> None:
     assert "❌ Failed to load file" in str(excinfo.value)
 
 
-def test_query_too_large(tmp_path: Path) -> None:
+def test_query_too_large(tmp_path: Path, tls_material: Tuple[str, str]) -> None:
+    cert_path, key_path = tls_material
     file_path = tmp_path / "data.txt"
     file_path.write_text("example\n")
 
@@ -195,28 +166,31 @@ def test_query_too_large(tmp_path: Path) -> None:
 reread_on_query=False
 max_payload=10
 use_ssl=True
+certfile={cert_path}
+keyfile={key_path}
 """)
 
-    port = get_free_port()
-    server = StringSearchServer(host="127.0.0.1", port=port, config_path=str(config_path))
-
-    thread = threading.Thread(target=server.start, daemon=True)
-    thread.start()
-    time.sleep(0.1)
+    server = StringSearchServer(host="127.0.0.1", port=0, config_path=str(config_path))
+    server_thread = start_server(server)
+    port = server.bound_port
 
     oversized_query = "x" * 100
-    context = ssl._create_unverified_context()
-    with context.wrap_socket(socket.socket(socket.AF_INET), server_hostname="127.0.0.1") as client:
+    with CLIENT_CTX.wrap_socket(socket.socket(socket.AF_INET), server_hostname="127.0.0.1") as client:
         client.connect(("127.0.0.1", port))
         client.sendall(oversized_query.encode())
         response = client.recv(1024).decode()
 
+    server.stop()
+    server_thread.join(timeout=1)
+    assert response.strip() == "QUERY TOO LARGE"
+
+
 def test_missing_file_path(tmp_path: Path) -> None:
     config_path = tmp_path / "config.txt"
     config_path.write_text("linuxpath=/nonexistent/path.txt\nuse_ssl=False\n")
 
     with pytest.raises(SystemExit) as e:
-        StringSearchServer(host="127.0.0.1", port=get_free_port(), config_path=str(config_path))
+        StringSearchServer(host="127.0.0.1", port=0, config_path=str(config_path))
 
     assert "Failed to load file" in str(e.value)
 
@@ -228,28 +202,183 @@ def test_file_not_found_explicit(tmp_path: Path) -> None:
     config_path.write_text(f"linuxpath={missing_file}\nreread_on_query=False\n")
 
     with pytest.raises(SystemExit) as e:
-        StringSearchServer(host="127.0.0.1", port=get_free_port(), config_path=str(config_path))
+        StringSearchServer(host="127.0.0.1", port=0, config_path=str(config_path))
 
     assert "Failed to load file" in str(e.value)
 
 
-def test_load_file_raises_for_nonexistent_file(tmp_path: Path) -> None:
-    """Test that load_file raises SystemExit for missing files."""
-    fake_path = tmp_path / "no_file.txt"
-    with pytest.raises(SystemExit) as exc:
-        load_file(str(fake_path))
-    assert "Failed to load file" in str(exc.value)
+def test_intern_query_reuses_string(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Identical raw queries map to the same str and the pool stays bounded."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    config_path: str = create_temp_config(tmp_path, f"linuxpath={data_file}\n")
+    server = StringSearchServer(config_path=config_path)
+    monkeypatch.setattr("server.server.INTERN_LIMIT", 2)
 
+    first = server._intern_query(b" apple\n")
+    assert first == "apple"
+    assert server._intern_query(b" apple\n") is first
 
-def create_temp_config(tmp_path: Path, content: str) -> str:
-    config_path = tmp_path / "config.txt"
-    config_path.write_text(content)
-    return str(config_path)
+    server._intern_query(b"pear")
+    server._intern_query(b"plum")
+    assert list(server._intern) == [b"pear", b"plum"]
+
+
+def test_reread_skips_unchanged_file(tmp_path: Path) -> None:
+    """With reread_on_query the file is only reloaded after it changes."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    config_path: str = create_temp_config(tmp_path, f"linuxpath={data_file}\nreread_on_query=True\n")
+    server = StringSearchServer(config_path=config_path)
 
+    first = server._get_buffer()
+    assert server._get_buffer() is first
 
-def test_file_not_found(tmp_path: Path) -> None:
-    """Test SystemExit when the data file does not exist."""
-    config_path: str = create_temp_config(tmp_path, "linuxpath=nonexistent.txt\n")
-    with pytest.raises(SystemExit) as exc:
-        StringSearchServer(config_path=config_path)
-    assert "Failed to load file" in str(exc.value)
+    data_file.write_text("apple\nbanana\n")
+    assert server._get_buffer() == b"\napple\nbanana\n"
+
+
+def test_config_mapping_skips_config_file(tmp_path: Path) -> None:
+    """A config mapping is used as-is and config_path is never read."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    server = StringSearchServer(config_path=str(tmp_path / "missing.txt"), config={"linuxpath": str(data_file), "max_payload": 8})
+    assert server.max_payload == 8
+    assert query_in_process(server, b"apple") == "STRING EXISTS"
+
+
+def test_stop_with_idle_client(tmp_path: Path) -> None:
+    """stop() returns promptly even while a client is connected without sending a query."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    server = StringSearchServer(host=HOST, port=0, config={"linuxpath": str(data_file)})
+    thread = start_server(server)
+
+    with socket.create_connection((HOST, server.bound_port), timeout=2):
+        server.stop()
+        thread.join(timeout=2.0)
+        assert not thread.is_alive()
+
+
+def test_idle_client_times_out(tmp_path: Path) -> None:
+    """A client that sends nothing is disconnected after read_timeout seconds."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    server = StringSearchServer(host=HOST, port=0, config={"linuxpath": str(data_file), "read_timeout": 0.1})
+    start_server(server)
+    try:
+        with socket.create_connection((HOST, server.bound_port), timeout=2) as client:
+            assert client.recv(4096) == b""
+    finally:
+        server.stop()
+
+
+def test_reread_on_query_sees_file_changes(tmp_path: Path) -> None:
+    """A live reread_on_query server answers from the file as it is at query time."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    server = StringSearchServer(host=HOST, port=0, config={"linuxpath": str(data_file), "reread_on_query": "True"})
+    start_server(server)
+    try:
+        assert send_query("apple", server.bound_port, use_ssl=False) == "STRING EXISTS"
+        assert send_query("cherry", server.bound_port, use_ssl=False) == "STRING NOT FOUND"
+
+        data_file.write_text("cherry\n")
+        assert send_query("cherry", server.bound_port, use_ssl=False) == "STRING EXISTS"
+        assert send_query("apple", server.bound_port, use_ssl=False) == "STRING NOT FOUND"
+    finally:
+        server.stop()
+
+
+def test_reread_server_survives_missing_file(tmp_path: Path) -> None:
+    """Deleting the data file under a reread_on_query server does not stop it."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    server = StringSearchServer(host=HOST, port=0, config={"linuxpath": str(data_file), "reread_on_query": "True"})
+    thread = start_server(server)
+    try:
+        data_file.unlink()
+        assert send_query("apple", server.bound_port, use_ssl=False) == "SERVER ERROR"
+        assert thread.is_alive()
+
+        data_file.write_text("apple\n")
+        assert send_query("apple", server.bound_port, use_ssl=False) == "STRING EXISTS"
+    finally:
+        server.stop()
+
+
+def test_reread_search_failure_is_answered(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """An error raised by the pooled reread search is answered with SERVER ERROR."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    server = StringSearchServer(host=HOST, port=0, config={"linuxpath": str(data_file), "reread_on_query": "True"})
+    thread = start_server(server)
+    try:
+        monkeypatch.setattr(server, "_get_buffer", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+        assert send_query("apple", server.bound_port, use_ssl=False) == "SERVER ERROR"
+        monkeypatch.undo()
+        assert send_query("apple", server.bound_port, use_ssl=False) == "STRING EXISTS"
+        assert thread.is_alive()
+    finally:
+        server.stop()
+
+
+def _child_pids(pid: int) -> List[int]:
+    """Return the pids of the processes whose parent is pid (Linux /proc)."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                stat = Path(f"/proc/{entry}/stat").read_text()
+            except OSError:
+                continue
+            if int(stat.rsplit(")", 1)[1].split()[1]) == pid:  # Field 4 is the parent pid.
+                children.append(int(entry))
+    return children
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or not os.path.isdir("/proc"), reason="needs fork and /proc")
+def test_run_forks_workers_and_stops_them(tmp_path: Path) -> None:
+    """run() with workers=2 serves queries from a forked worker and reaps it on SIGTERM."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\n")
+    config_path = create_temp_config(tmp_path, f"linuxpath={data_file}\nuse_ssl=False\nworkers=2\n")
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        port = probe.getsockname()[1]
+
+    proc = subprocess.Popen(
+        [sys.executable, "-c", f"from server.server import run; run({config_path!r}, host={HOST!r}, port={port})"],
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            children = _child_pids(proc.pid)
+            try:
+                if children and send_query("apple", port, use_ssl=False) == "STRING EXISTS":
+                    break
+            except OSError:
+                pass
+            assert time.monotonic() < deadline, "workers did not start"
+            time.sleep(0.05)
+        assert len(children) == 1
+
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+        for pid in children:
+            assert not os.path.exists(f"/proc/{pid}")  # Stopped and reaped by the parent.
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+@pytest.mark.parametrize("reread", ["True", "False"], ids=["reread", "cached"])
+def test_unicode_whitespace_is_stripped(tmp_path: Path, reread: str) -> None:
+    """Queries and file lines drop the same Unicode whitespace in both modes."""
+    data_file = tmp_path / "data.txt"
+    data_file.write_text("apple\nbanana \n", encoding="utf-8")
+    server = StringSearchServer(config={"linuxpath": str(data_file), "reread_on_query": reread})
+    assert query_in_process(server, "apple ".encode("utf-8")) == "STRING EXISTS"
+    assert query_in_process(server, b"banana") == "STRING EXISTS"